@@ -15,9 +15,8 @@ and frame rates.
 
 Tools and libraries used:
   - rawpy: To read and process RAW (DNG) files.
-  - imageio: To save processed images as JPEG.
-  - OpenCV (cv2): To assemble JPEGs into a video.
-  - FFmpeg: For applying a LUT and encoding in ProRes or H.264 formats.
+  - OpenCV (cv2): To encode the intermediate JPEGs.
+  - FFmpeg: For assembling the video, applying a LUT and encoding in ProRes or H.264 formats.
   - tqdm: For interactive progress bars.
   
 This script is intended as both a working tool and a tutorial for integrating
@@ -27,19 +26,34 @@ Customize the functions below to suit your needs!
 """
 
 import os
-import glob
 import sys
 import subprocess
+import shutil
 import logging
 import traceback
 import time
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import tempfile
+import hashlib
+import io
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import TYPE_CHECKING
 
-import rawpy       # Library to read RAW files (DNG)
-import imageio     # Library for saving images
-import cv2         # OpenCV library for video creation
 from tqdm import tqdm  # For progress bars
 
+if TYPE_CHECKING:
+    import numpy  # Only for type annotations; imported lazily at runtime (see below)
+
+# The heavier libraries are imported inside the functions that use them, so
+# the script starts quickly and steps that only run FFmpeg (such as exporting
+# videos from existing frames) never load them:
+#   - numpy:    array library (gamma lookup tables)
+#   - rawpy:    library to read RAW files (DNG)
+#   - cv2:      OpenCV, for JPEG encoding (and video creation without FFmpeg)
+#   - tifffile: 16-bit TIFF writing (intermediate frames for ProRes)
+
 # ------------------------------------------------------------------------------
 # LOGGING SETUP
 # ------------------------------------------------------------------------------
@@ -70,20 +84,41 @@ logger.addHandler(ch)
 DEFAULT_LUT_PATH = "/home/pi/cinemate/resources/LUTs/LUT_ROMEO&JULIETTE.cube"
 # Default frames per second for the output video
 DEFAULT_FPS = 24
-
-# Default RAW->JPEG conversion options
-# These values are chosen to produce a flat, log-like image.
-DEFAULT_RAWPY_OPTIONS = {
-    "gamma": (10.1, 10.1),               # Gamma value applied during postprocessing.
-    "no_auto_bright": True,              # Disable auto brightness adjustments.
-    "bright": 3,                         # Brightness multiplier.
-    "output_color": rawpy.ColorSpace.raw,  # Output in the raw (linear) color space.
-    "use_camera_wb": True,               # Use camera white balance.
-    "demosaic_algorithm": rawpy.DemosaicAlgorithm.LINEAR,  # Linear demosaicing for a flat look.
-    "highlight_mode": rawpy.HighlightMode.Ignore,        # Ignore highlights (avoid blending/clipping).
-    "user_black": 200,                   # User-defined black level (adjust for shadow detail).
-    "user_sat": 10000                    # User-defined saturation threshold (preserve highlights).
+# JPEG quality used for the intermediate (flat) frames. They are encoded with
+# 4:2:0 chroma subsampling, which halves the chroma data to encode.
+JPEG_QUALITY = 85
+# Minimum number of frames per segment when a LUT is applied to a video in
+# parallel segments (shorter videos are processed in a single FFmpeg run)
+LUT_SEGMENT_MIN_FRAMES = 48
+# Frames per worker call when frames are streamed into FFmpeg (see
+# process_and_encode). Kept small and fixed, so the frames held in memory
+# do not grow with the length of the clip.
+STREAM_BATCH_FRAMES = 4
+# FFmpeg prores_ks profile numbers for each Apple ProRes variant
+PRORES_PROFILES = {
+    "proxy": "0",
+    "lt": "1",
+    "422": "2",
+    "hq": "3"
 }
+# Hardware H.264 encoders tried for MP4 output, in order of preference, with
+# their FFmpeg options (see _h264_encoder_args): NVIDIA NVENC and the
+# Raspberry Pi's V4L2 memory-to-memory encoder. libx264 is used otherwise.
+HW_H264_ENCODERS = {
+    "h264_nvenc": ["-preset", "p5", "-cq", "23"],
+    "h264_v4l2m2m": ["-b:v", "12M"],
+}
+# FFmpeg arguments of the software H.264 encoder, used when no hardware
+# encoder works (or when one fails during a run)
+LIBX264_ARGS = ["-c:v", "libx264", "-preset", "veryfast", "-crf", "20", "-pix_fmt", "yuv420p"]
+
+# Immutable, picklable form of the RAW conversion options as handed to the
+# DNG workers (see _make_raw_params): the keys of _default_rawpy_options()
+# plus half_size.
+RawParams = namedtuple("RawParams", [
+    "gamma", "no_auto_bright", "bright", "output_color", "use_camera_wb",
+    "demosaic_algorithm", "highlight_mode", "user_black", "user_sat", "half_size"
+])
 
 # ------------------------------------------------------------------------------
 # UTILITY FUNCTIONS
@@ -144,6 +179,79 @@ def list_folder_contents(path: str):
     except Exception as e:
         logging.debug("Error listing contents of '%s': %s", os.path.abspath(path), e, exc_info=True)
 
+def list_files_with_suffix(folder: str, suffix: str) -> list:
+    """
+    Returns the sorted paths of the files in folder whose name ends with
+    suffix (case-insensitive). Hidden files (such as macOS "._" files) are
+    skipped, like glob would.
+    
+    Uses a single os.scandir() pass, which avoids glob's pattern matching and
+    extra stat() calls on folders with thousands of frames.
+    """
+    suffix = suffix.lower()
+    try:
+        with os.scandir(folder) as entries:
+            return sorted(entry.path for entry in entries
+                          if entry.name.lower().endswith(suffix)
+                          and not entry.name.startswith(".") and entry.is_file())
+    except OSError as e:
+        logging.debug("Error scanning '%s': %s", os.path.abspath(folder), e, exc_info=True)
+        return []
+
+@lru_cache(maxsize=None)
+def physical_cpu_count() -> int:
+    """
+    Returns the number of physical CPU cores this process can use, which is
+    how many DNG workers (and parallel LUT segments) are started. SMT siblings are
+    not counted: two workers sharing a core mostly compete for its caches.
+    
+    On Linux, the CPUs this process may run on are grouped by the core they
+    belong to (from /sys/devices/system/cpu/cpu*/topology). Elsewhere,
+    physical cores are counted with psutil if it is installed. Otherwise
+    (and never above it) the count is the number of logical CPUs this
+    process is allowed to run on.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = os.sched_getaffinity(0)
+        cores = set()
+        for cpu in cpus:
+            topology = f"/sys/devices/system/cpu/cpu{cpu}/topology"
+            for name in ("core_cpus_list", "thread_siblings_list"):  # Older kernels: thread_siblings_list
+                try:
+                    with open(os.path.join(topology, name)) as f:
+                        cores.add(f.read().strip())
+                    break
+                except OSError:
+                    continue
+            else:
+                cores.add(str(cpu))  # No topology information: count the CPU itself
+        return max(1, len(cores))
+    available = os.cpu_count() or 1
+    try:
+        import psutil  # Optional: only used to tell physical from logical cores
+        physical = psutil.cpu_count(logical=False)
+    except ImportError:
+        physical = None
+    return max(1, min(available, physical or available))
+
+def _default_rawpy_options() -> dict:
+    """
+    Returns the default RAW->JPEG conversion options (a new dictionary on
+    every call). These values are chosen to produce a flat, log-like image.
+    """
+    import rawpy
+    return {
+        "gamma": (10.1, 10.1),               # Gamma value applied during postprocessing.
+        "no_auto_bright": True,              # Disable auto brightness adjustments.
+        "bright": 3,                         # Brightness multiplier.
+        "output_color": rawpy.ColorSpace.raw,  # Output in the raw (linear) color space.
+        "use_camera_wb": True,               # Use camera white balance.
+        "demosaic_algorithm": rawpy.DemosaicAlgorithm.LINEAR,  # Linear demosaicing for a flat look (unused with half_size).
+        "highlight_mode": rawpy.HighlightMode.Ignore,        # Ignore highlights (avoid blending/clipping).
+        "user_black": 200,                   # User-defined black level (adjust for shadow detail).
+        "user_sat": 10000                    # User-defined saturation threshold (preserve highlights).
+    }
+
 def customize_rawpy_options() -> dict:
     """
     Prompts the user to customize RAW->JPEG conversion parameters.
@@ -152,6 +260,7 @@ def customize_rawpy_options() -> dict:
     Each parameter can be modified and these values can be integrated into your camera interface.
     For example, you might change gamma, brightness, or choose a different demosaic algorithm.
     """
+    import rawpy
     options = {}
     try:
         # Gamma: provide a value that will be used for both channels.
@@ -176,14 +285,24 @@ def customize_rawpy_options() -> dict:
         # Use the camera's white balance.
         options["use_camera_wb"] = prompt_yes_no("Use camera white balance?")
 
-        # Choose a demosaic algorithm (affects image sharpness and contrast).
-        demosaic_choice = prompt_choice("Select demosaic algorithm", ["linear", "vng", "ahd"])
-        if demosaic_choice == "vng":
-            options["demosaic_algorithm"] = rawpy.DemosaicAlgorithm.VNG
-        elif demosaic_choice == "ahd":
-            options["demosaic_algorithm"] = rawpy.DemosaicAlgorithm.AHD
-        else:
-            options["demosaic_algorithm"] = rawpy.DemosaicAlgorithm.LINEAR
+        # Choose a demosaic algorithm (affects image sharpness, contrast and speed).
+        # Besides LINEAR, additional algorithms are offered: PPG is the fast one,
+        # while VNG, AHD and DCB are slower but sharper. AMaZE is only offered
+        # when the installed LibRaw has the GPL3 demosaic pack, which LibRaw
+        # dropped in 0.20, so it normally does not appear.
+        # Note: with half_size enabled LibRaw skips demosaicing entirely, so this
+        # choice only affects full quality processing.
+        demosaic_algorithms = {
+            "linear": rawpy.DemosaicAlgorithm.LINEAR,
+            "ppg": rawpy.DemosaicAlgorithm.PPG,
+            "vng": rawpy.DemosaicAlgorithm.VNG,
+            "ahd": rawpy.DemosaicAlgorithm.AHD,
+            "dcb": rawpy.DemosaicAlgorithm.DCB,
+            "amaze": rawpy.DemosaicAlgorithm.AMAZE,
+        }
+        demosaic_choices = [name for name, algo in demosaic_algorithms.items() if algo.isSupported]
+        demosaic_choice = prompt_choice("Select demosaic algorithm", demosaic_choices)
+        options["demosaic_algorithm"] = demosaic_algorithms[demosaic_choice]
 
         # Highlight mode: how to handle highlights (ignore, clip, or blend).
         hl_choice = prompt_choice("Select highlight mode", ["ignore", "clip", "blend"])
@@ -203,26 +322,260 @@ def customize_rawpy_options() -> dict:
         options["user_sat"] = float(user_sat_str)
     except Exception as e:
         logging.error("Error customizing RAW settings: %s", e, exc_info=True)
-        return DEFAULT_RAWPY_OPTIONS
+        return _default_rawpy_options()
 
     return options
 
-def process_single_dng(dng_file: str, output_path: str, rawpy_options: dict):
+# ------------------------------------------------------------------------------
+# DNG PROCESSING
+# ------------------------------------------------------------------------------
+# Per-process state for the DNG workers. It is filled once by _init_worker()
+# when a worker process starts, so nothing in here is rebuilt for every frame.
+_worker_state = {}
+
+def _gamma_lut(power: float, slope: float, bits: int = 8) -> "numpy.ndarray":
+    """
+    Builds a 65536-entry lookup table that maps LibRaw's linear 16-bit output
+    to 8-bit values (or 16-bit values with bits=16), using the same gamma
+    curve LibRaw would apply for gamma=(power, slope) (a power curve with a
+    linear toe of the given slope).
+    
+    Applying this table to the output of postprocess(gamma=(1, 1), output_bps=16)
+    gives the same image as postprocess(gamma=(power, slope)) to within one
+    8-bit level, but replaces a per-pixel pow() with a single table lookup.
+    """
+    import numpy as np
+    # Solve for the toe/power transition point exactly like LibRaw's gamma_curve().
+    g0, g1 = 1.0 / power, slope
+    g2 = g3 = g4 = 0.0
+    bnd = [0.0, 0.0]
+    bnd[1 if g1 >= 1 else 0] = 1.0
+    if g1 and (g1 - 1) * (g0 - 1) <= 0:
+        for _ in range(48):
+            g2 = (bnd[0] + bnd[1]) / 2
+            bnd[1 if ((g2 / g1) ** -g0 - 1) / g0 - 1 / g2 > -1 else 0] = g2
+        g3 = g2 / g1
+        g4 = g2 * (1 / g0 - 1)
+    r = np.arange(0x10000) / 0x10000
+    curve = np.where(r < g3, r * g1, np.power(r, g0) * (1 + g4) - g4)
+    levels = 1 << bits
+    return np.clip(np.floor(curve * levels), 0, levels - 1).astype(np.uint8 if bits <= 8 else np.uint16)
+
+def _make_raw_params(rawpy_options: dict = None, half_size: bool = None) -> RawParams:
+    """
+    Freezes RAW conversion options into a RawParams tuple.
+    
+    Options missing from rawpy_options take the values of _default_rawpy_options()
+    (the script's flat look, not LibRaw's own defaults).
+    half_size, if given, overrides any "half_size" entry in rawpy_options.
+    The caller's dictionary is never modified.
+    
+    Raises ValueError if rawpy_options has keys other than RawParams' fields.
+    """
+    options = dict(_default_rawpy_options(), half_size=False)
+    if rawpy_options:
+        unknown = set(rawpy_options) - set(RawParams._fields)
+        if unknown:
+            raise ValueError("Unsupported RAW option(s) for batch processing: " + ", ".join(sorted(unknown)))
+        options.update(rawpy_options)
+    if half_size is not None:
+        options["half_size"] = half_size
+    return RawParams(**options)
+
+def _warmup_dng(width: int = 64, height: int = 64) -> bytes:
+    """
+    Builds a tiny, valid DNG in memory: an uncompressed 16-bit RGGB Bayer
+    frame of flat grey, with just the tags LibRaw needs to process it.
+    Used by _init_worker() to warm up LibRaw without reading a real file.
+    """
+    import numpy as np
+    import tifffile
+    buffer = io.BytesIO()
+    tifffile.imwrite(buffer, np.full((height, width), 1024, dtype=np.uint16),
+                     photometric="cfa", metadata=None, extratags=[
+        (271, "s", 0, "DNG", True),                  # Make
+        (33421, "H", 2, (2, 2), True),               # CFARepeatPatternDim
+        (33422, "B", 4, (0, 1, 1, 2), True),         # CFAPattern: RGGB
+        (50706, "B", 4, (1, 4, 0, 0), True),         # DNGVersion
+        (50708, "s", 0, "Warmup", True),             # UniqueCameraModel
+        (50717, "I", 1, 4095, True),                 # WhiteLevel
+        (50721, "2i", 9, (1, 1, 0, 1, 0, 1,          # ColorMatrix1: identity
+                          0, 1, 1, 1, 0, 1,
+                          0, 1, 0, 1, 1, 1), True),
+        (50728, "2I", 3, (1, 2, 1, 1, 1, 2), True),  # AsShotNeutral
+    ])
+    return buffer.getvalue()
+
+def _init_worker(raw_params: RawParams = None, use_thumb: bool = False):
+    """
+    Initializes a worker process of the DNG processing pool.
+    
+    Stores the RAW conversion parameters and builds the gamma lookup tables and
+    the JPEG encoder parameters once per process, so none of them has to be
+    sent along with (or rebuilt for) every frame.
+    process_single_dng() then reuses them for every frame the worker handles.
+    
+    With use_thumb, frames are taken from the JPEG preview embedded in each
+    DNG when there is one (see _render_jpeg).
+    
+    Otherwise the worker converts one tiny synthetic DNG first (see
+    _warmup_dng). This only loads the libraries and pages in LibRaw's code
+    for the chosen options before the first real frame: LibRaw sizes its
+    buffers per image, and with OMP_NUM_THREADS=1 (as the script sets it)
+    there are no OpenMP threads to start.
+    """
+    import cv2
+    import rawpy
+    if raw_params is None:
+        raw_params = _make_raw_params()
+    _worker_state["use_thumb"] = use_thumb
+    # LibRaw outputs linear 16-bit data and the gamma curve is applied with a
+    # lookup table instead (see _gamma_lut).
+    _worker_state["gamma_lut"] = _gamma_lut(*raw_params.gamma)
+    _worker_state["gamma_lut16"] = _gamma_lut(*raw_params.gamma, bits=16)
+    _worker_state["raw_params"] = raw_params
+    _worker_state["postprocess_options"] = dict(raw_params._asdict(), gamma=(1, 1), output_bps=16)
+    _worker_state["jpeg_params"] = [
+        cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY,
+        cv2.IMWRITE_JPEG_OPTIMIZE, 0,
+        cv2.IMWRITE_JPEG_SAMPLING_FACTOR, cv2.IMWRITE_JPEG_SAMPLING_FACTOR_420,
+    ]
+    if not use_thumb:
+        try:
+            with rawpy.imread(io.BytesIO(_warmup_dng())) as raw:
+                raw.postprocess(**_worker_state["postprocess_options"])
+        except Exception as e:
+            logging.debug("Worker warm-up failed (harmless): %s", e)
+
+def _encode_jpeg(rgb) -> "numpy.ndarray":
+    """
+    Encodes an 8-bit RGB image as JPEG with the worker's encoder parameters
+    (see _init_worker). The image's channels are swapped in place.
+    """
+    import cv2
+    if "jpeg_params" not in _worker_state:
+        _init_worker()
+    # OpenCV expects BGR: swap the channels in place instead of allocating a copy.
+    cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR, dst=rgb)
+    ok, jpeg = cv2.imencode(".jpg", rgb, _worker_state["jpeg_params"])
+    if not ok:
+        raise RuntimeError("JPEG encoding failed")
+    return jpeg
+
+def _encode_tiff(planes) -> memoryview:
+    """
+    Encodes channel-first image planes as a planar TIFF (one plane per
+    channel). The planes are compressed with fast (level 1) zlib after a
+    horizontal predictor, which keeps the files lossless but well below the
+    size of raw 16-bit data.
+    """
+    import tifffile
+    buffer = io.BytesIO()
+    tifffile.imwrite(buffer, planes, photometric="rgb", planarconfig="separate",
+                     compression="zlib", compressionargs={"level": 1}, predictor=True)
+    return buffer.getbuffer()
+
+def _render_jpeg(dng_file: str, rawpy_options: dict = None):
+    """
+    Reads a DNG file, applies the RAW->JPEG conversion with the parameters the
+    worker was initialized with (see _init_worker) and returns the JPEG-encoded
+    frame as a bytes-like buffer. Raises on failure.
+    
+    If the worker was initialized with use_thumb and the DNG embeds a JPEG
+    preview, that preview is returned as-is: no demosaic, gamma or encoding.
+    DNGs without a usable preview go through the normal conversion.
+    
+    If rawpy_options is given, it is passed to raw.postprocess() as-is
+    instead (LibRaw's defaults apply to anything it leaves out).
+    """
+    import rawpy
+    if "jpeg_params" not in _worker_state:
+        _init_worker()
+    with rawpy.imread(dng_file) as raw:
+        if rawpy_options is not None:
+            return _encode_jpeg(raw.postprocess(**rawpy_options))
+        if _worker_state["use_thumb"]:
+            try:
+                thumb = raw.extract_thumb()
+                if thumb.format == rawpy.ThumbFormat.JPEG:
+                    return thumb.data
+                logging.debug("Embedded preview of %s is not a JPEG. Converting the RAW data instead.", dng_file)
+            except rawpy.LibRawError as e:
+                logging.debug("No usable embedded preview in %s (%s). Converting the RAW data instead.", dng_file, e)
+        rgb16 = raw.postprocess(**_worker_state["postprocess_options"])
+    return _encode_jpeg(_worker_state["gamma_lut"][rgb16])
+
+def _render_tiff(dng_file: str, rawpy_options: dict = None):
+    """
+    Reads a DNG file like _render_jpeg(), but keeps 16 bits per channel and
+    returns the frame as a planar TIFF (R, G and B planes, see _encode_tiff)
+    in a bytes-like buffer. Raises on failure.
+    
+    Used when the frames end up in ProRes (10-bit), which an 8-bit JPEG
+    intermediate would otherwise limit. Embedded previews are never used here.
+    
+    If rawpy_options is given, it is passed to raw.postprocess() as-is
+    instead (so the bit depth is whatever its "output_bps" asks for).
+    """
+    import numpy as np
+    import rawpy
+    if "gamma_lut16" not in _worker_state:
+        _init_worker()
+    with rawpy.imread(dng_file) as raw:
+        if rawpy_options is not None:
+            return _encode_tiff(np.ascontiguousarray(raw.postprocess(**rawpy_options).transpose(2, 0, 1)))
+        rgb16 = raw.postprocess(**_worker_state["postprocess_options"])
+    # Looking up the channel-first view writes the planar layout directly,
+    # in the same pass that applies the gamma curve.
+    return _encode_tiff(_worker_state["gamma_lut16"][rgb16.transpose(2, 0, 1)])
+
+def _write_frame(path: str, data) -> None:
+    """
+    Writes an encoded frame to path, then issues POSIX_FADV_DONTNEED on it
+    (where available).
+    
+    On Linux this does not drop the freshly written (still dirty) pages: it
+    only starts their writeback right away, so thousands of frames do not
+    build up as dirty data that is flushed in one long stall later (on the
+    Pi's SD card, for example). The pages stay cached, which suits the
+    FFmpeg step that reads the frames straight back.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data).cast("B")
+        while view:
+            view = view[os.write(fd, view):]
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+def process_single_dng(dng_file: str, output_path: str, rawpy_options: dict = None):
     """
     Processes a single DNG file:
       - Reads the DNG using rawpy.
       - Applies the RAW->JPEG conversion with specified options.
-      - Saves the resulting JPEG.
+      - Encodes the result with OpenCV (libjpeg-turbo) and saves the JPEG.
       
+    If output_path ends in ".tif", a 16-bit planar TIFF is saved instead
+    (see _render_tiff).
+    
+    If rawpy_options is not provided, the options the worker was initialized
+    with (see _init_worker) are used. Otherwise the dictionary is passed to
+    raw.postprocess() as given: any postprocess() keyword works, and LibRaw's
+    own defaults apply to anything it leaves out.
+    
     Returns the output path on success, or None on failure.
     
     This function can be modified to integrate into your camera interface,
     where you might process frames on-the-fly.
     """
     try:
-        with rawpy.imread(dng_file) as raw:
-            rgb = raw.postprocess(**rawpy_options)
-        imageio.imsave(output_path, rgb)
+        if output_path.lower().endswith(".tif"):
+            frame = _render_tiff(dng_file, rawpy_options)
+        else:
+            frame = _render_jpeg(dng_file, rawpy_options)
+        _write_frame(output_path, frame)
         # Log file details.
         if os.path.exists(output_path):
             file_size = os.path.getsize(output_path)
@@ -235,12 +588,67 @@ def process_single_dng(dng_file: str, output_path: str, rawpy_options: dict):
         logging.error("Error processing '%s': %s", dng_file, e, exc_info=True)
         return None
 
-def process_dng_files_parallel(input_folder: str, half_size_value: bool = True, rawpy_options: dict = None) -> str or None:
+def _process_batch(tasks: list) -> list:
+    """
+    Processes a batch of (dng_file, output_path) tasks inside one worker call,
+    using the options the worker was initialized with.
+    Returns a list of (dng_file, result) pairs, where result is the value
+    returned by process_single_dng().
+    """
+    return [(dng_file, process_single_dng(dng_file, output_path))
+            for dng_file, output_path in tasks]
+
+def _encode_batch(dng_files: list) -> list:
+    """
+    Converts a batch of DNG files to JPEG in memory, inside one worker call.
+    Returns a list of (dng_file, jpeg) pairs, where jpeg is None on failure.
+    """
+    results = []
+    for dng_file in dng_files:
+        try:
+            results.append((dng_file, _render_jpeg(dng_file)))
+        except Exception as e:
+            logging.error("Error processing '%s': %s", dng_file, e, exc_info=True)
+            results.append((dng_file, None))
+    return results
+
+def _frame_size(dng_file: str, raw_params: RawParams, use_thumb: bool = False) -> tuple or None:
+    """
+    Converts dng_file in this process exactly like the workers would and
+    returns the (width, height) of the resulting frame, or None on failure.
+    """
+    import cv2
+    import numpy as np
+    try:
+        _init_worker(raw_params, use_thumb)
+        frame = cv2.imdecode(np.frombuffer(_render_jpeg(dng_file), dtype=np.uint8), cv2.IMREAD_COLOR)
+        return frame.shape[1], frame.shape[0]
+    except Exception as e:
+        logging.debug("Could not determine the frame size from '%s': %s", dng_file, e, exc_info=True)
+        return None
+
+def process_dng_files_parallel(input_folder: str, half_size_value: bool = True, rawpy_options: dict = None,
+                               use_thumb: bool = False, frame_format: str = "jpg") -> str or None:
     """
     Processes all DNG files in the specified input folder in parallel.
     JPEGs are saved into a local "processed" folder within the input folder.
     
+    With frame_format="tif", the frames are saved as 16-bit planar TIFFs
+    instead, which keeps the full bit depth for ProRes output (at the cost of
+    much larger files). use_thumb does not apply to TIFF frames.
+    
     If rawpy_options is not provided, default options (with half_size set) are used.
+    Options it leaves out take the script's defaults, and keys other than the
+    RawParams fields are an error (see _make_raw_params).
+    rawpy_options itself is not modified.
+    
+    With use_thumb, the JPEG preview embedded in each DNG is saved instead of
+    converting the RAW data, which is much faster for a quick look (the
+    preview is the camera's rendering, not the flat look).
+    
+    One worker runs per physical CPU core. When calling this from your own
+    code, set OMP_NUM_THREADS=1 before rawpy is first imported (the script does
+    this) so each worker's LibRaw does not start its own OpenMP threads too.
     
     Returns the path to the processed folder.
     
@@ -261,44 +669,56 @@ def process_dng_files_parallel(input_folder: str, half_size_value: bool = True,
         return None
 
     # Find all DNG files in the folder.
-    glob_pattern = os.path.join(abs_input_folder, "*.[dD][nN][gG]")
-    dng_files = sorted(glob.glob(glob_pattern))
-    logging.debug("Using pattern: %s | Found %d DNG files", glob_pattern, len(dng_files))
+    dng_files = list_files_with_suffix(abs_input_folder, ".dng")
+    logging.debug("Found %d DNG files in %s", len(dng_files), abs_input_folder)
     if not dng_files:
         logging.info("No DNG files found in %s", abs_input_folder)
         return None
 
     logging.info("Found %d DNG files.", len(dng_files))
 
-    # Use default options if none provided.
-    if rawpy_options is None:
-        rawpy_options = DEFAULT_RAWPY_OPTIONS.copy()
-        rawpy_options["half_size"] = half_size_value
-    else:
-        rawpy_options["half_size"] = half_size_value
+    # Remove frames of the other format left over from an earlier run, so
+    # the videos are made only from the frames written now.
+    stale_suffix = ".jpg" if frame_format == "tif" else ".tif"
+    for stale_file in list_files_with_suffix(output_folder, stale_suffix):
+        if os.path.basename(stale_file).startswith("frame_"):
+            os.remove(stale_file)
+
+    # Freeze the options (default ones if none provided) once, up front.
+    try:
+        raw_params = _make_raw_params(rawpy_options, half_size=half_size_value)
+    except ValueError as e:
+        logging.error("%s", e)
+        return None
 
     start_time = time.time()
     results = []
 
+    # Split the frames into batches so each worker call handles several files.
+    # This cuts the number of IPC round-trips from one per frame to one per batch,
+    # while ~4 batches per worker still keep the load balanced.
+    # The RAW parameters are handed to each worker once, through the pool initializer.
+    tasks = [(dng_file, os.path.join(output_folder, f"frame_{idx:05d}.{frame_format}"))
+             for idx, dng_file in enumerate(dng_files)]
+    num_workers = physical_cpu_count()
+    batch_size = max(1, len(tasks) // (4 * num_workers))
+    batches = [tasks[i:i + batch_size] for i in range(0, len(tasks), batch_size)]
+    logging.debug("Dispatching %d frames in %d batches of up to %d", len(tasks), len(batches), batch_size)
+
     # Use a ProcessPoolExecutor for parallel processing.
-    with ProcessPoolExecutor() as executor:
-        futures = {}
-        for idx, dng_file in enumerate(dng_files):
-            out_path = os.path.join(output_folder, f"frame_{idx:05d}.jpg")
-            future = executor.submit(process_single_dng, dng_file, out_path, rawpy_options)
-            futures[future] = dng_file
-
-        pbar = tqdm(total=len(futures), desc="Processing DNG files", unit="frame", dynamic_ncols=True)
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker,
+                             initargs=(raw_params, use_thumb)) as executor:
+        pbar = tqdm(total=len(tasks), desc="Processing DNG files", unit="frame", dynamic_ncols=True)
         processed_count = 0
-        for f in as_completed(futures):
-            result = f.result()
-            if result is None:
-                logging.error("Failed to process: %s", futures[f])
-            else:
-                results.append(result)
-            processed_count += 1
+        for batch_results in executor.map(_process_batch, batches):
+            for dng_file, result in batch_results:
+                if result is None:
+                    logging.error("Failed to process: %s", dng_file)
+                else:
+                    results.append(result)
+            processed_count += len(batch_results)
             pbar.set_postfix({"Processed": processed_count})
-            pbar.update(1)
+            pbar.update(len(batch_results))
         pbar.close()
 
     total_time = time.time() - start_time
@@ -316,24 +736,262 @@ def process_dng_files_parallel(input_folder: str, half_size_value: bool = True,
 
     return output_folder
 
-def create_video_from_images(image_folder: str, output_video: str, fps: int) -> str or None:
+# ------------------------------------------------------------------------------
+# VIDEO CREATION
+# ------------------------------------------------------------------------------
+
+def _encoder_args(output_format: str, prores_variant: str = None,
+                  frame_size: tuple = None, hardware: bool = True) -> list:
     """
-    Creates a video from JPEG images in the specified folder using OpenCV.
+    Returns the FFmpeg video encoder arguments for an output format:
+      - "copy":   stream-copy the input frames (only valid without filters).
+      - "mp4":    H.264 via a hardware encoder if available (see
+                  _h264_encoder_args), libx264 otherwise or with hardware=False.
+      - "prores": Apple ProRes via prores_ks, with the given variant (default "hq").
     
-    This function assembles the images (which can be used as proxies or for preview)
-    into an H.264 encoded MP4 video.
+    frame_size, as (width, height), makes the hardware encoder probe use the
+    real frame size (hardware encoders have size limits).
+    """
+    if output_format == "copy":
+        return ["-c:v", "copy"]
+    if output_format == "prores":
+        return ["-c:v", "prores_ks", "-profile:v", PRORES_PROFILES.get(prores_variant, "3"),
+                "-pix_fmt", "yuv422p10le"]
+    if not hardware:
+        return list(LIBX264_ARGS)
+    return list(_h264_encoder_args(*(frame_size or ())))
+
+def _uses_hw_encoder(args: list) -> bool:
+    """Returns True if FFmpeg arguments select one of HW_H264_ENCODERS."""
+    return any(arg in HW_H264_ENCODERS for arg in args)
+
+@lru_cache(maxsize=None)
+def _h264_encoder_args(width: int = 256, height: int = 256) -> tuple:
+    """
+    Returns the FFmpeg arguments of the H.264 encoder to use: the first
+    encoder of HW_H264_ENCODERS that FFmpeg provides and that passes a short
+    test encode at width x height (it can be built in without the hardware
+    being present, and the Pi's encoder rejects frames over 1920 pixels),
+    or libx264. Each probe runs only once per session.
     
-    Returns the path to the output video.
+    The default size only checks that the encoder works at all. FFmpeg runs
+    that use it are retried with libx264 if they fail (see _run_ffmpeg_h264).
     """
-    abs_folder = os.path.abspath(image_folder)
-    glob_pattern = os.path.join(abs_folder, "*.jpg")
-    image_files = sorted(glob.glob(glob_pattern))
-    logging.debug("Found %d JPEG images in %s", len(image_files), abs_folder)
-    if not image_files:
-        logging.info("No images found in '%s' for video creation.", abs_folder)
+    available = _ffmpeg_output("-encoders").split()
+    for encoder, options in HW_H264_ENCODERS.items():
+        if encoder not in available:
+            continue
+        args = ("-c:v", encoder, *options, "-pix_fmt", "yuv420p")
+        try:
+            result = subprocess.run([
+                "ffmpeg", "-hide_banner", "-loglevel", "error",
+                "-f", "lavfi", "-i", f"color=size={width}x{height}:duration=0.2", *args, "-f", "null", "-"
+            ], capture_output=True)
+        except OSError:
+            break
+        if result.returncode == 0:
+            logging.debug("Using hardware H.264 encoder %s for %dx%d frames", encoder, width, height)
+            return args
+        logging.debug("Hardware H.264 encoder %s is not usable at %dx%d: %s",
+                      encoder, width, height, result.stderr.strip())
+    return tuple(LIBX264_ARGS)
+
+@lru_cache(maxsize=None)
+def _ffmpeg_output(*args: str) -> str:
+    """
+    Runs "ffmpeg -hide_banner <args>" and returns its combined output, or an
+    empty string if FFmpeg cannot be run. Used to probe FFmpeg's capabilities;
+    each probe runs only once per session.
+    """
+    try:
+        result = subprocess.run(["ffmpeg", "-hide_banner", *args], capture_output=True, text=True)
+    except OSError:
+        return ""
+    return result.stdout + result.stderr
+
+def _run_ffmpeg(cmd: list, pbar: tqdm) -> None:
+    """
+    Runs an FFmpeg command and drives pbar from FFmpeg's machine-readable
+    progress output (-progress pipe:1), one step per encoded frame.
+    
+    Raises subprocess.CalledProcessError if FFmpeg exits with an error, just
+    like subprocess.run(cmd, check=True).
+    """
+    cmd = [cmd[0], "-hide_banner", "-loglevel", "error", "-nostats", "-progress", "pipe:1", *cmd[1:]]
+    last_frame = 0
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True) as proc:
+        for line in proc.stdout:
+            key, _, value = line.strip().partition("=")
+            if key == "frame" and value.isdigit():
+                frame = int(value)
+                pbar.update(frame - last_frame)
+                last_frame = frame
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+def _run_ffmpeg_h264(cmd: list, pbar: tqdm) -> None:
+    """
+    Runs an FFmpeg command like _run_ffmpeg(). If it fails and uses a hardware
+    H.264 encoder (which can reject the frame size, or run out of sessions),
+    the command is run again with libx264 in its place.
+    """
+    try:
+        _run_ffmpeg(cmd, pbar)
+    except subprocess.CalledProcessError as e:
+        if not _uses_hw_encoder(cmd):
+            raise
+        logging.info("Hardware H.264 encoding failed (%s). Retrying with libx264.", e)
+        software_cmd = []
+        i = 0
+        while i < len(cmd):
+            if cmd[i] == "-c:v" and i + 1 < len(cmd) and cmd[i + 1] in HW_H264_ENCODERS:
+                # Skip "-c:v <encoder> <options> -pix_fmt yuv420p" (see _h264_encoder_args).
+                software_cmd += LIBX264_ARGS
+                i += 2 + len(HW_H264_ENCODERS[cmd[i + 1]]) + 2
+            else:
+                software_cmd.append(cmd[i])
+                i += 1
+        pbar.reset()
+        _run_ffmpeg(software_cmd, pbar)
+
+def _gpu_lut_supported() -> bool:
+    """
+    Returns True if FFmpeg can apply a LUT on the GPU: it needs Vulkan
+    hardware acceleration and a libplacebo filter that can load LUT files.
+    """
+    return ("vulkan" in _ffmpeg_output("-hwaccels").split()
+            and "lut_type" in _ffmpeg_output("-h", "filter=libplacebo"))
+
+def _gpu_lut_filter(lut_file: str, output_format: str, src: str = "", dst: str = "") -> str:
+    """
+    Returns an FFmpeg filter chain that applies lut_file on the GPU with
+    libplacebo (a 3D texture lookup), uploading and downloading the frames
+    in the pixel format the encoder of output_format expects. The FFmpeg
+    command needs "-init_hw_device vulkan=gpu -filter_hw_device gpu".
+    """
+    pix_fmt = "yuv422p10le" if output_format == "prores" else "yuv420p"
+    return (f"{src}format={pix_fmt},hwupload,libplacebo=lut='{lut_file}':format={pix_fmt},"
+            f"hwdownload,format={pix_fmt}{dst}")
+
+@lru_cache(maxsize=None)
+def _hald_clut(lut_file: str) -> str or None:
+    """
+    Converts a .cube LUT into a Hald CLUT image (level 8, 16-bit PNG) once, so
+    FFmpeg can apply it with the haldclut filter instead of parsing the text
+    .cube file again in every run (for example, in every parallel segment).
+    
+    The PNG is kept in the temporary directory, keyed on the LUT's path and
+    modification time, and reused while the LUT is unchanged. It is written
+    to a temporary name first and only renamed into place once complete.
+    Returns the PNG path, or None if the LUT is not a .cube file or the
+    conversion fails (callers then use lut3d on the original file).
+    """
+    if not lut_file.lower().endswith(".cube"):
+        return None
+    try:
+        abs_lut = os.path.abspath(lut_file)
+        key = hashlib.sha1(f"{abs_lut}:{os.path.getmtime(abs_lut)}".encode()).hexdigest()[:16]
+        hald_path = os.path.join(tempfile.gettempdir(), f"dng_to_video_hald_{key}.png")
+        if not os.path.exists(hald_path):
+            # Render under a unique name and rename it into place, so an
+            # interrupted run never leaves a truncated PNG under the reused name.
+            fd, tmp_path = tempfile.mkstemp(suffix=".png", prefix=f"dng_to_video_hald_{key}_",
+                                            dir=os.path.dirname(hald_path))
+            os.close(fd)
+            try:
+                subprocess.run([
+                    "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+                    "-f", "lavfi", "-i", "haldclutsrc=8",
+                    "-vf", f"lut3d='{abs_lut}'", "-frames:v", "1", "-pix_fmt", "rgb48be", tmp_path
+                ], check=True)
+                os.replace(tmp_path, hald_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        logging.debug("Using Hald CLUT %s for %s", hald_path, lut_file)
+        return hald_path
+    except (OSError, subprocess.CalledProcessError) as e:
+        logging.info("Could not convert '%s' to a Hald CLUT (%s). Using lut3d instead.", lut_file, e)
         return None
 
-    first_frame = cv2.imread(image_files[0])
+def _lut_filter(lut_file: str, src: str = "[in]", dst: str = "[out]") -> str:
+    """
+    Returns a filtergraph that applies lut_file to the src pad and writes the
+    dst pad (the defaults are the pads of a simple -vf filtergraph).
+    .cube LUTs are applied through a pre-converted Hald CLUT (see _hald_clut).
+    """
+    hald_path = _hald_clut(lut_file)
+    if hald_path is None:
+        return f"{src}lut3d='{lut_file}'{dst}"
+    return f"movie='{hald_path}'[hald];{src}[hald]haldclut{dst}"
+
+def _output_args(output_video: str, output_format: str, prores_variant: str = None,
+                 lut_file: str = None, flat_video: str = None, flat_format: str = "copy",
+                 flat_prores_variant: str = None, gpu: bool = False, frame_size: tuple = None) -> list:
+    """
+    Returns the FFmpeg output arguments (everything after the input) for the
+    videos made from a single input stream of frames.
+    
+    Without lut_file, the frames are encoded into output_video as-is.
+    With lut_file, output_video receives the LUT-graded frames and, if
+    flat_video is given, the ungraded frames are also written to flat_video
+    (straight from the decoded input, so "copy" remains possible).
+    With gpu, the LUT is applied on the GPU (see _gpu_lut_filter).
+    frame_size is passed on to _encoder_args(). Only one output uses a
+    hardware H.264 encoder, since those often allow a single session.
+    """
+    encoder_args = _encoder_args(output_format, prores_variant, frame_size)
+    if lut_file is None:
+        return [*encoder_args, output_video]
+    if gpu:
+        lut_graph = _gpu_lut_filter(lut_file, output_format, "[0:v]", "[graded]")
+    else:
+        lut_graph = _lut_filter(lut_file, "[0:v]", "[graded]")
+    args = [
+        "-filter_complex", lut_graph,
+        "-map", "[graded]", *encoder_args, output_video
+    ]
+    if flat_video:
+        args += ["-map", "0:v", *_encoder_args(flat_format, flat_prores_variant, frame_size,
+                                               hardware=not _uses_hw_encoder(encoder_args)), flat_video]
+    return args
+
+def _frame_suffix(image_folder: str) -> str:
+    """
+    Returns the suffix of the frames in image_folder: ".tif" if it holds
+    16-bit TIFF frames (see process_dng_files_parallel), ".jpg" otherwise.
+    """
+    return ".tif" if list_files_with_suffix(image_folder, ".tif") else ".jpg"
+
+def _read_image(path: str):
+    """
+    Reads and decodes an image file like cv2.imread(), but tells the kernel
+    the file is read sequentially (POSIX_FADV_SEQUENTIAL, where available) so
+    it can read ahead aggressively. Returns None if the file cannot be decoded.
+    """
+    import cv2
+    import numpy as np
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        with os.fdopen(fd, "rb", closefd=False) as f:
+            data = f.read()
+    finally:
+        os.close(fd)
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+def _create_video_opencv(image_files: list, output_video: str, fps: int) -> str or None:
+    """
+    Creates an MP4 (mp4v) video from the given JPEG files using OpenCV.
+    Used by create_video_from_images() when FFmpeg is not available.
+    
+    A small thread pool reads and decodes the next frames ahead of the writer
+    (cv2.imdecode releases the GIL while decoding), so disk reads and JPEG
+    decoding overlap with the encoding done by VideoWriter.write() in this thread.
+    """
+    import cv2
+    first_frame = _read_image(image_files[0])
     if first_frame is None:
         logging.info("Unable to read first image: %s", image_files[0])
         return None
@@ -347,49 +1005,101 @@ def create_video_from_images(image_folder: str, output_video: str, fps: int) ->
         return None
 
     pbar = tqdm(total=len(image_files), desc="Creating flat video (OpenCV)", unit="frame", dynamic_ncols=True)
-    for file in image_files:
-        frame = cv2.imread(file)
-        if frame is None:
-            logging.error("Skipping unreadable image: %s", file)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        # Keep up to 8 frames decoded or decoding ahead of the writer.
+        pending = deque()
+        files = iter(image_files)
+        for file in islice(files, 8):
+            pending.append((file, executor.submit(_read_image, file)))
+        while pending:
+            file, future = pending.popleft()
+            next_file = next(files, None)
+            if next_file is not None:
+                pending.append((next_file, executor.submit(_read_image, next_file)))
+            frame = future.result()
+            if frame is None:
+                logging.error("Skipping unreadable image: %s", file)
+                pbar.update(1)
+                continue
+            try:
+                video_writer.write(frame)
+            except Exception as e:
+                logging.error("Error writing frame from %s: %s", file, e, exc_info=True)
             pbar.update(1)
-            continue
-        try:
-            video_writer.write(frame)
-        except Exception as e:
-            logging.error("Error writing frame from %s: %s", file, e, exc_info=True)
-        pbar.update(1)
     pbar.close()
 
     video_writer.release()
     logging.info("Flat video created: %s", os.path.abspath(output_video))
     return output_video
 
+def create_video_from_images(image_folder: str, output_video: str, fps: int, codec: str = "copy") -> str or None:
+    """
+    Creates an MP4 video from JPEG images in the specified folder using FFmpeg.
+    
+    With codec="copy" (the default) the JPEGs are muxed into the MP4 as-is
+    (MJPEG), so no frame is decoded or re-encoded and the step is IO-bound.
+    With codec="h264" the frames are encoded with libx264 instead, which gives
+    a smaller and more widely playable file (useful for sharing proxies).
+    TIFF frames cannot be muxed into an MP4 and are always encoded with H.264.
+    
+    If FFmpeg is not installed, the video is encoded with OpenCV (mp4v) instead.
+    
+    Returns the path to the output video.
+    """
+    abs_folder = os.path.abspath(image_folder)
+    suffix = _frame_suffix(abs_folder)
+    glob_pattern = os.path.join(abs_folder, "*" + suffix)
+    image_files = list_files_with_suffix(abs_folder, suffix)
+    logging.debug("Found %d %s images in %s", len(image_files), suffix, abs_folder)
+    if not image_files:
+        logging.info("No images found in '%s' for video creation.", abs_folder)
+        return None
+    if suffix == ".tif" and codec == "copy":
+        codec = "h264"
+
+    if shutil.which("ffmpeg") is None:
+        logging.info("FFmpeg not found. Creating the flat video with OpenCV instead.")
+        return _create_video_opencv(image_files, output_video, fps)
+
+    cmd = [
+        "ffmpeg", "-y", "-framerate", str(fps),
+        "-pattern_type", "glob", "-i", glob_pattern,
+        *_encoder_args("mp4" if codec == "h264" else "copy"), output_video
+    ]
+    logging.info("Creating flat video with FFmpeg (MP4, %s)...", codec)
+    pbar = tqdm(total=len(image_files), desc="Creating flat video (FFmpeg)", unit="frame", dynamic_ncols=True)
+    try:
+        _run_ffmpeg_h264(cmd, pbar)
+    except subprocess.CalledProcessError as e:
+        logging.error("FFmpeg error (flat video MP4): %s", e, exc_info=True)
+        pbar.close()
+        return None
+    pbar.close()
+    logging.info("Flat video created: %s", os.path.abspath(output_video))
+    return output_video
+
 def create_flat_video_ffmpeg(image_folder: str, output_video: str, fps: int, prores_variant: str = "hq") -> str or None:
     """
     Creates a flat video from JPEG images in image_folder using FFmpeg with ProRes encoding.
+    16-bit TIFF frames are used instead when the folder holds them.
     
     This method demonstrates how to generate a high-quality proxy using Apple ProRes.
     You can modify the FFmpeg command for further customizations.
     
     Returns the output video path.
     """
-    prores_profiles = {
-        "proxy": "0",
-        "lt": "1",
-        "422": "2",
-        "hq": "3"
-    }
-    profile = prores_profiles.get(prores_variant, "3")
+    suffix = _frame_suffix(image_folder)
     cmd = [
         "ffmpeg", "-y", "-framerate", str(fps),
-        "-pattern_type", "glob", "-i", os.path.join(image_folder, "*.jpg"),
-        "-c:v", "prores_ks", "-profile:v", profile,
+        "-pattern_type", "glob", "-i", os.path.join(image_folder, "*" + suffix),
+        *_encoder_args("prores", prores_variant),
         "-c:a", "copy", output_video
     ]
     logging.info("Creating flat video with FFmpeg (ProRes)...")
-    pbar = tqdm(total=0, desc="Creating flat video (FFmpeg)", dynamic_ncols=True)
+    frame_count = len(list_files_with_suffix(image_folder, suffix))
+    pbar = tqdm(total=frame_count, desc="Creating flat video (FFmpeg)", unit="frame", dynamic_ncols=True)
     try:
-        subprocess.run(cmd, check=True)
+        _run_ffmpeg(cmd, pbar)
     except subprocess.CalledProcessError as e:
         logging.error("FFmpeg error (flat video ProRes): %s", e, exc_info=True)
         pbar.close()
@@ -398,56 +1108,338 @@ def create_flat_video_ffmpeg(image_folder: str, output_video: str, fps: int, pro
     logging.info("Flat ProRes video created: %s", os.path.abspath(output_video))
     return output_video
 
+def _probe_video(video: str) -> tuple or None:
+    """
+    Returns (frame_count, frame_rate) of the first video stream of a file using
+    ffprobe, or None if it cannot be determined.
+    """
+    cmd = [
+        "ffprobe", "-v", "error", "-select_streams", "v:0", "-count_packets",
+        "-show_entries", "stream=nb_read_packets,r_frame_rate",
+        "-of", "default=noprint_wrappers=1", video
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        info = dict(line.split("=", 1) for line in result.stdout.splitlines() if "=" in line)
+        num, den = info["r_frame_rate"].split("/")
+        return int(info["nb_read_packets"]), float(num) / float(den)
+    except (OSError, subprocess.CalledProcessError, KeyError, ValueError, ZeroDivisionError) as e:
+        logging.debug("Could not probe '%s': %s", video, e)
+        return None
+
+def _apply_lut_in_segments(input_video: str, lut_file: str, output_video: str, encoder_args: list,
+                           frame_count: int, frame_rate: float, pbar: tqdm) -> bool:
+    """
+    Applies a LUT by splitting the video (frame_count frames at frame_rate) into
+    equal frame ranges, grading them with one single-threaded FFmpeg process
+    per CPU core, and joining the results with the concat demuxer (stream copy). Audio, if any,
+    is copied from the input. All segments advance the same progress bar.
+    
+    Returns False without doing anything if the video is too short to be worth
+    splitting. Raises subprocess.CalledProcessError if an FFmpeg run fails.
+    
+    Used only by apply_lut_with_ffmpeg(), for callers that grade an existing
+    video; the interactive workflow grades in create_graded_video_ffmpeg().
+    """
+    num_segments = min(physical_cpu_count(), frame_count // LUT_SEGMENT_MIN_FRAMES)
+    if num_segments < 2:
+        return False
+
+    logging.info("Applying LUT in %d parallel segments...", num_segments)
+    bounds = [frame_count * i // num_segments for i in range(num_segments + 1)]
+    extension = os.path.splitext(output_video)[1]
+    output_dir = os.path.dirname(os.path.abspath(output_video))
+    with tempfile.TemporaryDirectory(prefix="lut_segments_", dir=output_dir) as tmp_dir:
+        segment_cmds = []
+        segment_paths = []
+        for i in range(num_segments):
+            segment_path = os.path.join(tmp_dir, f"segment_{i:03d}{extension}")
+            # Seek to half a frame before the first frame of the range, so
+            # rounding can never drop or repeat a frame at the boundary.
+            start = max(0.0, (bounds[i] - 0.5) / frame_rate)
+            # One thread each for decoding, filtering and encoding: the
+            # segments already use every core, and FFmpeg's automatic
+            # threading would start that many threads again in every segment.
+            segment_cmds.append([
+                "ffmpeg", "-y", "-filter_threads", "1",
+                "-threads", "1", "-ss", f"{start:.6f}", "-i", input_video,
+                "-frames:v", str(bounds[i + 1] - bounds[i]),
+                "-vf", _lut_filter(lut_file), *encoder_args, "-threads", "1", "-an", segment_path
+            ])
+            segment_paths.append(segment_path)
+
+        with ThreadPoolExecutor(max_workers=num_segments) as executor:
+            for future in [executor.submit(_run_ffmpeg, cmd, pbar) for cmd in segment_cmds]:
+                future.result()
+
+        list_path = os.path.join(tmp_dir, "segments.txt")
+        with open(list_path, "w") as f:
+            for segment_path in segment_paths:
+                escaped = segment_path.replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        subprocess.run([
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-f", "concat", "-safe", "0", "-i", list_path, "-i", input_video,
+            "-map", "0:v", "-map", "1:a?", "-c", "copy", output_video
+        ], check=True)
+    return True
+
 def apply_lut_with_ffmpeg(input_video: str, lut_file: str, output_video: str, output_format: str = "mp4", prores_variant: str = None) -> str or None:
     """
-    Applies a 3D LUT to the input video using FFmpeg's lut3d filter.
+    Applies a 3D LUT to the input video using FFmpeg's lut3d filter
+    (via a pre-converted Hald CLUT for .cube files, see _hald_clut).
     
-    For MP4 (H.264) output, a simple command is used.
+    For MP4 (H.264) output, a hardware encoder (NVENC, or V4L2 on the
+    Raspberry Pi) is used when available, libx264 otherwise.
     For ProRes output, the prores_ks encoder is used with the specified variant.
     
+    On hosts where FFmpeg has Vulkan and libplacebo, the LUT is applied on the
+    GPU as a 3D texture lookup. Otherwise (or if the GPU pass fails) longer
+    videos are split into segments that are graded in parallel, one FFmpeg
+    process per CPU core, and short ones are graded in a single FFmpeg run.
+    Segments are not used with a hardware encoder, which only supports a few
+    concurrent sessions (often one).
+    
     This demonstrates how you can apply color grading in postprocessing.
+    The interactive workflow does not call it (it grades straight from the
+    processed frames, without an intermediate flat video, with
+    create_graded_video_ffmpeg()), so the segment splitting above only
+    applies when this function is called directly.
     Returns the output video path.
     """
-    if output_format == "mp4":
-        cmd = [
-            "ffmpeg", "-y", "-i", input_video,
-            "-vf", f"lut3d='{lut_file}'",
-            "-c:a", "copy", output_video
-        ]
-    elif output_format == "prores":
-        prores_profiles = {
-            "proxy": "0",
-            "lt": "1",
-            "422": "2",
-            "hq": "3"
-        }
-        profile = prores_profiles.get(prores_variant, "3")
-        cmd = [
-            "ffmpeg", "-y", "-i", input_video,
-            "-vf", f"lut3d='{lut_file}'",
-            "-c:v", "prores_ks", "-profile:v", profile,
+    if output_format not in ("mp4", "prores"):
+        logging.error("Unknown output format: %s", output_format)
+        return None
+    encoder_args = _encoder_args(output_format, prores_variant)
+    hw_encoder = _uses_hw_encoder(encoder_args)
+    cmd = [
+        "ffmpeg", "-y", "-i", input_video,
+        "-vf", _lut_filter(lut_file),
+        *encoder_args,
+        "-c:a", "copy", output_video
+    ]
+    gpu_cmd = None
+    if _gpu_lut_supported():
+        gpu_cmd = [
+            "ffmpeg", "-y", "-init_hw_device", "vulkan=gpu", "-filter_hw_device", "gpu",
+            "-i", input_video,
+            "-vf", _gpu_lut_filter(lut_file, output_format),
+            *encoder_args,
             "-c:a", "copy", output_video
         ]
-    else:
+
+    probe = _probe_video(input_video)
+    logging.info("Running FFmpeg to apply LUT%s...", " (GPU)" if gpu_cmd else "")
+    pbar = tqdm(total=probe[0] if probe else None, desc="Applying LUT with FFmpeg", unit="frame", dynamic_ncols=True)
+    try:
+        if gpu_cmd:
+            try:
+                _run_ffmpeg(gpu_cmd, pbar)
+            except subprocess.CalledProcessError as e:
+                logging.info("GPU LUT pass failed (%s). Falling back to the lut3d filter.", e)
+                gpu_cmd = None
+                pbar.reset()
+        if not gpu_cmd and not (probe and not hw_encoder
+                                and _apply_lut_in_segments(input_video, lut_file, output_video,
+                                                           encoder_args, *probe, pbar)):
+            _run_ffmpeg_h264(cmd, pbar)
+    except subprocess.CalledProcessError as e:
+        logging.error("FFmpeg error: %s", e, exc_info=True)
+        pbar.close()
+        return None
+    pbar.close()
+    logging.info("LUT-applied video created: %s", os.path.abspath(output_video))
+    return output_video
+
+def create_graded_video_ffmpeg(image_folder: str, lut_file: str, output_video: str, fps: int,
+                               output_format: str = "mp4", prores_variant: str = None,
+                               flat_video: str = None, flat_format: str = "copy",
+                               flat_prores_variant: str = None) -> str or None:
+    """
+    Creates the LUT-graded video straight from the JPEGs in image_folder,
+    in a single FFmpeg pass (JPEG -> lut3d -> encoder).
+    
+    If flat_video is given, the ungraded flat video is written by the same
+    FFmpeg run, from the same decoded frames. flat_format is "copy" (JPEG
+    stream copy into MP4), "mp4" (H.264) or "prores" (see flat_prores_variant).
+    
+    Compared to create_flat_video_ffmpeg() followed by apply_lut_with_ffmpeg(),
+    this skips decoding the flat video again and never writes an intermediate
+    file just to read it back.
+    
+    On hosts where FFmpeg has Vulkan and libplacebo, the LUT is applied on the
+    GPU, falling back to the CPU filters if that run fails.
+    
+    16-bit TIFF frames are used instead of JPEGs when the folder holds them
+    (a "copy" flat video is then encoded with H.264).
+    
+    Returns the graded video path.
+    """
+    if output_format not in ("mp4", "prores"):
         logging.error("Unknown output format: %s", output_format)
         return None
+    suffix = _frame_suffix(image_folder)
+    if suffix == ".tif" and flat_format == "copy":
+        flat_format = "mp4"
+    input_args = ["-framerate", str(fps), "-pattern_type", "glob",
+                  "-i", os.path.join(image_folder, "*" + suffix)]
+    cmd = [
+        "ffmpeg", "-y", *input_args,
+        *_output_args(output_video, output_format, prores_variant, lut_file,
+                      flat_video, flat_format, flat_prores_variant)
+    ]
+    gpu_cmd = None
+    if _gpu_lut_supported():
+        gpu_cmd = [
+            "ffmpeg", "-y", "-init_hw_device", "vulkan=gpu", "-filter_hw_device", "gpu", *input_args,
+            *_output_args(output_video, output_format, prores_variant, lut_file,
+                          flat_video, flat_format, flat_prores_variant, gpu=True)
+        ]
 
-    logging.info("Running FFmpeg to apply LUT...")
-    pbar = tqdm(total=0, desc="Applying LUT with FFmpeg", dynamic_ncols=True)
+    logging.info("Running FFmpeg to create the graded video%s%s...",
+                 " and the flat video" if flat_video else "", " (GPU)" if gpu_cmd else "")
+    frame_count = len(list_files_with_suffix(image_folder, suffix))
+    pbar = tqdm(total=frame_count, desc="Creating graded video (FFmpeg)", unit="frame", dynamic_ncols=True)
     try:
-        subprocess.run(cmd, check=True)
+        if gpu_cmd:
+            try:
+                _run_ffmpeg(gpu_cmd, pbar)
+            except subprocess.CalledProcessError as e:
+                logging.info("GPU LUT pass failed (%s). Falling back to the CPU filters.", e)
+                gpu_cmd = None
+                pbar.reset()
+        if not gpu_cmd:
+            _run_ffmpeg_h264(cmd, pbar)
     except subprocess.CalledProcessError as e:
-        logging.error("FFmpeg error: %s", e, exc_info=True)
+        logging.error("FFmpeg error (graded video): %s", e, exc_info=True)
         pbar.close()
         return None
     pbar.close()
+    if flat_video:
+        logging.info("Flat video created: %s", os.path.abspath(flat_video))
     logging.info("LUT-applied video created: %s", os.path.abspath(output_video))
     return output_video
 
+def process_and_encode(input_folder: str, output_video: str, fps: int,
+                       output_format: str = "mp4", prores_variant: str = None,
+                       lut_file: str = None, flat_video: str = None, flat_format: str = "copy",
+                       flat_prores_variant: str = None, half_size_value: bool = True,
+                       rawpy_options: dict = None, use_thumb: bool = False) -> str or None:
+    """
+    Converts all DNG files in input_folder and streams the JPEG frames straight
+    into FFmpeg's stdin, without writing them to disk.
+    
+    Without lut_file, output_video is the flat video (output_format can also be
+    "copy" to mux the JPEGs as-is). With lut_file, output_video is the graded
+    video and flat_video, if given, is written by the same FFmpeg run
+    (see create_graded_video_ffmpeg() for the on-disk equivalent).
+    
+    Use this when the processed JPEGs are not needed afterwards: on slow
+    storage (such as the Pi's SD card) it avoids writing every frame only
+    to read it back. use_thumb works as in process_dng_files_parallel().
+    
+    The LUT is always applied with the CPU filters here (not on the GPU):
+    the streamed frames cannot be replayed if a GPU run fails.
+    
+    Returns the output video path.
+    """
+    abs_input_folder = os.path.abspath(input_folder)
+    dng_files = list_files_with_suffix(abs_input_folder, ".dng")
+    logging.debug("Found %d DNG files in %s", len(dng_files), abs_input_folder)
+    if not dng_files:
+        logging.info("No DNG files found in %s", abs_input_folder)
+        return None
+    logging.info("Found %d DNG files.", len(dng_files))
+
+    try:
+        raw_params = _make_raw_params(rawpy_options, half_size=half_size_value)
+    except ValueError as e:
+        logging.error("%s", e)
+        return None
+
+    # Streamed frames cannot be replayed if a hardware H.264 encoder fails
+    # halfway, so probe it at the real frame size (from the first DNG) up front.
+    frame_size = None
+    if "mp4" in (output_format, flat_format if lut_file and flat_video else None):
+        frame_size = _frame_size(dng_files[0], raw_params, use_thumb)
+
+    cmd = [
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error", "-nostats",
+        "-f", "image2pipe", "-framerate", str(fps),
+        "-c:v", "mjpeg", "-i", "-",
+        *_output_args(output_video, output_format, prores_variant, lut_file,
+                      flat_video, flat_format, flat_prores_variant, frame_size=frame_size)
+    ]
+    logging.info("Streaming frames into FFmpeg...")
+    try:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+    except OSError as e:
+        logging.error("Could not start FFmpeg: %s", e, exc_info=True)
+        return None
+
+    start_time = time.time()
+    num_workers = physical_cpu_count()
+    batch_size = STREAM_BATCH_FRAMES
+    batches = [dng_files[i:i + batch_size] for i in range(0, len(dng_files), batch_size)]
+    failed = 0
+
+    # Batches are submitted ahead of FFmpeg only up to a window of 2 per worker,
+    # so at most 2 * num_workers * STREAM_BATCH_FRAMES encoded frames are held
+    # in memory when FFmpeg is the slower side, however long the clip is.
+    # Results are consumed in submission order, which keeps the frames in sequence.
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker,
+                             initargs=(raw_params, use_thumb)) as executor:
+        pending = deque()
+        next_batch = 0
+        pbar = tqdm(total=len(dng_files), desc="Processing and encoding", unit="frame", dynamic_ncols=True)
+        try:
+            while pending or next_batch < len(batches):
+                while next_batch < len(batches) and len(pending) < 2 * num_workers:
+                    pending.append(executor.submit(_encode_batch, batches[next_batch]))
+                    next_batch += 1
+                batch_results = pending.popleft().result()
+                for dng_file, jpeg in batch_results:
+                    if jpeg is None:
+                        logging.error("Failed to process: %s", dng_file)
+                        failed += 1
+                        continue
+                    proc.stdin.write(jpeg)
+                pbar.update(len(batch_results))
+        except BrokenPipeError:
+            logging.error("FFmpeg stopped reading frames early.")
+            for future in pending:
+                future.cancel()
+        finally:
+            pbar.close()
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    returncode = proc.wait()
+    if returncode != 0:
+        logging.error("FFmpeg error (streamed video): exited with status %d", returncode)
+        return None
+
+    total_time = time.time() - start_time
+    logging.info("Processed and encoded %d frames in %.2f sec (%d failed)", len(dng_files), total_time, failed)
+    if flat_video and lut_file:
+        logging.info("Flat video created: %s", os.path.abspath(flat_video))
+    logging.info("Video created: %s", os.path.abspath(output_video))
+    return output_video
+
 # ------------------------------------------------------------------------------
 # MAIN EXECUTION
 # ------------------------------------------------------------------------------
 if __name__ == "__main__":
+    # The DNG workers already run one process per physical core, so LibRaw's
+    # OpenMP threads would only oversubscribe the CPU: use one thread per worker
+    # unless the user chose a value. This must happen before rawpy (and with it
+    # the OpenMP runtime) is first imported. It is only done here, so code that
+    # imports this module (e.g. to call process_single_dng() on its own) keeps
+    # LibRaw's multithreading.
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+
     print("Welcome to the advanced DNG -> Flat -> LUT pipeline!")
     
     # Prompt user for DNG folder path.
@@ -457,18 +1449,19 @@ if __name__ == "__main__":
         sys.exit(1)
     logging.info("Script started. Input folder: %s", input_folder)
 
-    # Prompt for quality: full or half resolution.
-    quality_choice = prompt_choice("Select quality", ["full", "half"])
+    # Prompt for quality: full or half resolution, or the DNGs' embedded
+    # previews ("thumb") for a very fast quick look.
+    quality_choice = prompt_choice("Select quality", ["full", "half", "thumb"])
     half_size_value = False if quality_choice == "full" else True
+    use_thumb = quality_choice == "thumb"
 
     # Prompt for RAW configuration: use default or customize.
+    # The half_size flag from the quality choice is passed separately.
     use_default = prompt_yes_no("Use default RAW->JPEG color configuration?")
     if use_default:
-        rawpy_options = DEFAULT_RAWPY_OPTIONS.copy()
+        rawpy_options = None  # The processing functions use the defaults.
     else:
         rawpy_options = customize_rawpy_options()
-    # Ensure half_size is set based on the quality choice.
-    rawpy_options["half_size"] = half_size_value
 
     # Prompt for LUT path.
     lut_path = prompt_input("Enter path to LUT", DEFAULT_LUT_PATH)
@@ -481,57 +1474,116 @@ if __name__ == "__main__":
         logging.error("Invalid FPS entered. Using default FPS: %d", DEFAULT_FPS)
         fps_value = DEFAULT_FPS
 
-    # Check if processed folder exists. If yes, ask to reprocess or use existing.
-    abs_input_folder = os.path.abspath(input_folder)
-    processed_folder_path = os.path.join(abs_input_folder, "processed")
-    if os.path.exists(processed_folder_path):
-        reprocess_choice = prompt_choice("Processed folder already exists. Reprocess full DNGs (r) or export videos from existing JPEGs (e)", ["r", "e"])
-        if reprocess_choice == "r":
-            processed_folder = process_dng_files_parallel(input_folder, half_size_value=half_size_value, rawpy_options=rawpy_options)
-        else:
-            processed_folder = processed_folder_path
-    else:
-        processed_folder = process_dng_files_parallel(input_folder, half_size_value=half_size_value, rawpy_options=rawpy_options)
-    if not processed_folder:
-        logging.info("DNG processing failed. Exiting.")
-        sys.exit(1)
-
-    # Confirm before creating flat video.
-    if not prompt_yes_no("Proceed with creating a flat video from the processed images?"):
-        print("User chose not to create flat video. Exiting.")
-        sys.exit(0)
-
     # Prompt for flat video output format.
     flat_format = prompt_choice("Select flat video format", ["mp4", "prores"])
+    flat_prores_variant = None
     if flat_format == "prores":
         flat_prores_variant = prompt_choice("Select flat video ProRes variant", ["proxy", "lt", "422", "hq"])
         flat_video = os.path.join(input_folder, "flat_video.mov")
-        flat_result = create_flat_video_ffmpeg(processed_folder, flat_video, fps=fps_value, prores_variant=flat_prores_variant)
     else:
+        flat_codec = prompt_choice("Select flat video MP4 codec (copy = JPEG stream copy, fastest)", ["copy", "h264"])
         flat_video = os.path.join(input_folder, "flat_video.mp4")
-        flat_result = create_video_from_images(processed_folder, flat_video, fps=fps_value)
-    if not flat_result:
-        logging.info("Failed to create flat video. Exiting.")
-        sys.exit(1)
 
-    # Prompt for LUT-applied video output format.
-    lut_format = prompt_choice("Select LUT-applied video format", ["mp4", "prores"])
-    lut_prores_variant = None
-    if lut_format == "prores":
-        lut_prores_variant = prompt_choice("Select Apple ProRes variant", ["proxy", "lt", "422", "hq"])
-        final_output = os.path.join(input_folder, "lut_applied_video.mov")
+    if flat_format == "prores":
+        flat_encoding = "prores"
+    else:
+        flat_encoding = "mp4" if flat_codec == "h264" else "copy"
+
+    # Ask about the LUT up front, so the frames are processed knowing which
+    # videos will be made. The embedded previews are already the camera's
+    # rendering, not the flat log look the LUT expects, so "thumb" quality
+    # only makes the flat video.
+    if use_thumb:
+        logging.info("Thumb quality uses the camera-rendered previews; skipping the LUT (it expects flat frames).")
+        apply_lut = False
     else:
-        final_output = os.path.join(input_folder, "lut_applied_video.mp4")
+        apply_lut = prompt_yes_no("Apply LUT to create a graded video?")
+    lut_format = None
+    if apply_lut:
+        # Prompt for LUT-applied video output format.
+        lut_format = prompt_choice("Select LUT-applied video format", ["mp4", "prores"])
+        lut_prores_variant = None
+        if lut_format == "prores":
+            lut_prores_variant = prompt_choice("Select Apple ProRes variant", ["proxy", "lt", "422", "hq"])
+            final_output = os.path.join(input_folder, "lut_applied_video.mov")
+        else:
+            final_output = os.path.join(input_folder, "lut_applied_video.mp4")
+
+    # Check if processed folder exists. If yes, ask to reprocess or use existing.
+    abs_input_folder = os.path.abspath(input_folder)
+    processed_folder_path = os.path.join(abs_input_folder, "processed")
+    reuse_jpegs = False
+    if os.path.exists(processed_folder_path):
+        reprocess_choice = prompt_choice("Processed folder already exists. Reprocess full DNGs (r) or export videos from existing frames (e)", ["r", "e"])
+        reuse_jpegs = reprocess_choice == "e"
 
-    # Confirm before applying LUT.
-    if not prompt_yes_no("Apply LUT to create a graded video?"):
-        print("User chose not to apply LUT. Exiting.")
+    # When the DNGs are (re)processed, the JPEGs can either be saved to the
+    # "processed" folder or streamed straight into FFmpeg without touching disk.
+    stream_frames = False
+    if not reuse_jpegs:
+        stream_frames = not prompt_yes_no("Save the processed frames to the 'processed' folder? (n = stream frames straight into FFmpeg)")
+
+    # When a ProRes video will be made, the saved frames can be 16-bit TIFFs,
+    # so the 10-bit output is not limited by an 8-bit intermediate. They are
+    # many times larger than JPEGs, so only on request. A stream-copied flat
+    # MP4 needs JPEGs, and "thumb" quality only has 8-bit previews.
+    frame_format = "jpg"
+    if (not stream_frames and not reuse_jpegs and not use_thumb and flat_encoding != "copy"
+            and "prores" in (flat_format, lut_format)):
+        if prompt_yes_no("Save 16-bit TIFF frames for ProRes instead of JPEGs? (full bit depth, but much larger files)"):
+            frame_format = "tif"
+
+    if not stream_frames:
+        if reuse_jpegs:
+            processed_folder = processed_folder_path
+        else:
+            processed_folder = process_dng_files_parallel(input_folder, half_size_value=half_size_value,
+                                                          rawpy_options=rawpy_options, use_thumb=use_thumb,
+                                                          frame_format=frame_format)
+        if not processed_folder:
+            logging.info("DNG processing failed. Exiting.")
+            sys.exit(1)
+
+        # Confirm before creating flat video.
+        if not prompt_yes_no("Proceed with creating a flat video from the processed images?"):
+            print("User chose not to create flat video. Exiting.")
+            sys.exit(0)
+
+    if not apply_lut:
+        # Only create the flat video.
+        if stream_frames:
+            flat_result = process_and_encode(input_folder, flat_video, fps=fps_value,
+                                             output_format=flat_encoding, prores_variant=flat_prores_variant,
+                                             half_size_value=half_size_value, rawpy_options=rawpy_options,
+                                             use_thumb=use_thumb)
+        elif flat_format == "prores":
+            flat_result = create_flat_video_ffmpeg(processed_folder, flat_video, fps=fps_value, prores_variant=flat_prores_variant)
+        else:
+            flat_result = create_video_from_images(processed_folder, flat_video, fps=fps_value, codec=flat_codec)
+        if not flat_result:
+            logging.info("Failed to create flat video. Exiting.")
+            sys.exit(1)
+        if use_thumb:
+            print("No LUT applied at thumb quality. 'flat_video' was created in your input folder.")
+        else:
+            print("User chose not to apply LUT. 'flat_video' was created in your input folder.")
         sys.exit(0)
 
-    # Apply LUT via FFmpeg.
-    lut_result = apply_lut_with_ffmpeg(flat_video, lut_path, final_output, output_format=lut_format, prores_variant=lut_prores_variant)
+    # Create the flat and the LUT-applied video in a single FFmpeg pass.
+    if stream_frames:
+        lut_result = process_and_encode(input_folder, final_output, fps=fps_value,
+                                        output_format=lut_format, prores_variant=lut_prores_variant,
+                                        lut_file=lut_path, flat_video=flat_video, flat_format=flat_encoding,
+                                        flat_prores_variant=flat_prores_variant,
+                                        half_size_value=half_size_value, rawpy_options=rawpy_options,
+                                        use_thumb=use_thumb)
+    else:
+        lut_result = create_graded_video_ffmpeg(processed_folder, lut_path, final_output, fps=fps_value,
+                                                output_format=lut_format, prores_variant=lut_prores_variant,
+                                                flat_video=flat_video, flat_format=flat_encoding,
+                                                flat_prores_variant=flat_prores_variant)
     if not lut_result:
-        logging.info("Error applying LUT. Exiting.")
+        logging.info("Error creating the flat and LUT-applied videos. Exiting.")
         sys.exit(1)
 
     logging.info("All steps completed successfully. Script finished.")